@@ -6,33 +6,189 @@ STL models where swirling tracks are carved as curved grooves in the tile surfac
 
 Usage:
 ```
-python create_tile_mesh.py [--engine earcut|triangle] [--sample 36]
+python create_tile_mesh.py [--engine manifold|earcut|triangle] [--sample 36]
 ```
 """
 
 import os
 import random
+import struct
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+import manifold3d
 import numpy as np
+import shapely
 import trimesh
-from shapely.geometry import LineString, Polygon
-from shapely.ops import unary_union
+from shapely.geometry import MultiPolygon, Polygon, box
 from trimesh.creation import extrude_polygon
 from trimesh.boolean import difference
 
-from generate_path_tiles import generate_matchings
+from generate_path_tiles import generate_matchings, unique_matchings
 
 try:
-    import mapbox_earcut
+    # Preferred: unlike earcut it copes with the near-collinear vertices
+    # left where analytic groove outlines meet the endpoint dots
+    from manifold3d import triangulate
 
-    DEFAULT_ENGINE = "earcut"
+    DEFAULT_ENGINE = "manifold"
 except ImportError:
     try:
-        import triangle
+        import mapbox_earcut
 
-        DEFAULT_ENGINE = "triangle"
+        DEFAULT_ENGINE = "earcut"
     except ImportError:
-        DEFAULT_ENGINE = None
+        try:
+            import triangle
+
+            DEFAULT_ENGINE = "triangle"
+        except ImportError:
+            DEFAULT_ENGINE = None
+
+
+def _resolve_bool_engine() -> str:
+    """Pick the boolean engine once by carving one unit cube from another."""
+    try:
+        cube = manifold3d.Manifold.cube((1, 1, 1))
+        if not (cube - cube.translate((0.5, 0, 0))).is_empty():
+            return "manifold"
+    except Exception:
+        pass
+    return "scad"
+
+
+_BOOL_ENGINE = _resolve_bool_engine()
+
+# Precision grid (mm) that 2D cutter outlines are snapped to before extrusion
+_GRID_SIZE = 1e-9
+
+
+@lru_cache(maxsize=8)
+def _base_box(tile_size: float, tile_thickness: float) -> trimesh.Trimesh:
+    """Solid tile body, shared between tiles with the same dimensions."""
+    return trimesh.creation.box(
+        extents=[tile_size, tile_size, tile_thickness],
+        transform=trimesh.transformations.translation_matrix(
+            [tile_size / 2, tile_size / 2, tile_thickness / 2]
+        ),
+    )
+
+
+@lru_cache(maxsize=8)
+def _base_manifold(tile_size: float, tile_thickness: float) -> manifold3d.Manifold:
+    """Solid tile body as a Manifold, built once instead of converted per tile."""
+    return manifold3d.Manifold.cube((tile_size, tile_size, tile_thickness))
+
+
+@lru_cache(maxsize=8)
+def _endpoints2d(tile_size: float, dot_inset: float) -> tuple:
+    """The 8 endpoint positions, clockwise from the top-left."""
+    q = tile_size / 4.0
+    # Apply inset to move dot centers inward from the edge
+    return (
+        (q, tile_size - dot_inset),  # Top edge
+        (3 * q, tile_size - dot_inset),  # Top edge
+        (tile_size - dot_inset, 3 * q),  # Right edge
+        (tile_size - dot_inset, q),  # Right edge
+        (3 * q, dot_inset),  # Bottom edge
+        (q, dot_inset),  # Bottom edge
+        (dot_inset, q),  # Left edge
+        (dot_inset, 3 * q),  # Left edge
+    )
+
+
+@lru_cache(maxsize=8)
+def _tile_boundary(tile_size: float) -> Polygon:
+    """Square outline of the tile, used to clip the endpoint dots."""
+    return box(0, 0, tile_size, tile_size)
+
+
+@lru_cache(maxsize=8)
+def _endpoint_dots(tile_size: float, dot_inset: float, dot_radius: float) -> tuple:
+    """Endpoint dot outlines, clipped to the tile boundary."""
+    angles = np.linspace(0, 2 * np.pi, 32, endpoint=False)
+    unit_circle = np.column_stack([np.cos(angles), np.sin(angles)])
+    centers = np.array(_endpoints2d(tile_size, dot_inset))
+    circles = shapely.polygons(centers[:, None, :] + dot_radius * unit_circle)
+    # Snap to a fine grid so points on the tile edge don't leave
+    # near-duplicate vertices that break the extrusion
+    clipped = shapely.intersection(
+        circles, _tile_boundary(tile_size), grid_size=_GRID_SIZE
+    )
+    dot_polygons = []
+    for i, dot in enumerate(clipped):
+        if dot.area > 0:
+            dot_polygons.append(dot)
+        else:
+            print(f"Warning: Invalid clipped dot at endpoint {i}, skipping")
+    return tuple(dot_polygons)
+
+
+def _ragged(arrays) -> tuple:
+    """Stack coordinate arrays with the per-point geometry indices Shapely expects."""
+    coords = np.vstack(arrays)
+    indices = np.repeat(np.arange(len(arrays)), [len(a) for a in arrays])
+    return coords, indices
+
+
+def _union_parts(parts):
+    """Union polygons, skipping GEOS entirely when their bounding boxes are disjoint."""
+    parts = list(parts)
+    if len(parts) < 2:
+        return shapely.union_all(parts)
+    bounds = shapely.bounds(parts)
+    overlap = (
+        (bounds[:, None, 0] <= bounds[None, :, 2])
+        & (bounds[None, :, 0] <= bounds[:, None, 2])
+        & (bounds[:, None, 1] <= bounds[None, :, 3])
+        & (bounds[None, :, 1] <= bounds[:, None, 3])
+    )
+    np.fill_diagonal(overlap, False)
+    if not overlap.any():
+        return MultiPolygon(parts)
+    return shapely.union_all(parts)
+
+
+def _bezier_tube(curve, tangents, r: float, caps: bool = True, cap_segments: int = 16):
+    """Outline of a sampled curve offset by r on both sides.
+
+    Matches ``LineString.buffer(r, cap_style=1)`` without going through GEOS:
+    the left side runs along the curve, an optional round cap turns around
+    the end, and the right side runs back to the start.
+    """
+    unit = tangents / np.linalg.norm(tangents, axis=1)[:, None]
+    offset = r * np.column_stack([-unit[:, 1], unit[:, 0]])
+    if not caps:
+        return np.vstack([curve + offset, (curve - offset)[::-1]])
+    # Half turns from the left side to the right side, excluding the ends
+    # that the offset sides already provide
+    sweep = np.linspace(np.pi / 2, -np.pi / 2, cap_segments + 1)[1:-1]
+    end_angles = np.arctan2(unit[-1, 1], unit[-1, 0]) + sweep
+    start_angles = np.arctan2(unit[0, 1], unit[0, 0]) + sweep + np.pi
+    end_cap = curve[-1] + r * np.column_stack([np.cos(end_angles), np.sin(end_angles)])
+    start_cap = curve[0] + r * np.column_stack(
+        [np.cos(start_angles), np.sin(start_angles)]
+    )
+    return np.vstack([curve + offset, end_cap, (curve - offset)[::-1], start_cap])
+
+
+def _to_manifold(mesh: trimesh.Trimesh) -> manifold3d.Manifold:
+    """Wrap a trimesh's vertex/face arrays as a Manifold solid."""
+    solid = manifold3d.Manifold(
+        manifold3d.Mesh(
+            vert_properties=np.asarray(mesh.vertices, dtype=np.float32),
+            tri_verts=np.asarray(mesh.faces, dtype=np.uint32),
+        )
+    )
+    if solid.status() != manifold3d.Error.NoError:
+        raise ValueError(f"Mesh is not a valid manifold: {solid.status()}")
+    return solid
+
+
+def _to_trimesh(solid: manifold3d.Manifold) -> trimesh.Trimesh:
+    """Convert a Manifold solid back into a trimesh for export."""
+    mesh = solid.to_mesh()
+    return trimesh.Trimesh(vertices=mesh.vert_properties, faces=mesh.tri_verts)
 
 
 def create_tile_mesh(
@@ -45,7 +201,9 @@ def create_tile_mesh(
     dot_inset: float = 0.0,
     dot_depth: float = None,
     bezier_steps: int = 64,
+    bezier_tolerance: float = 0.01,
     triang_engine: str = None,
+    check_cutters: bool = False,
 ) -> trimesh.Trimesh:
     """Build a Path Tiles tile with curved grooves and endpoint circle cuts embedded into the surface."""
     engine = triang_engine or DEFAULT_ENGINE
@@ -55,153 +213,146 @@ def create_tile_mesh(
             "  pip install mapbox-earcut triangle"
         )
 
-    base = trimesh.creation.box(
-        extents=[tile_size, tile_size, tile_thickness],
-        transform=trimesh.transformations.translation_matrix(
-            [tile_size / 2, tile_size / 2, tile_thickness / 2]
-        ),
-    )
-
-    q = tile_size / 4.0
-    # Apply inset to move dot centers inward from the edge
-    endpoints2d = [
-        (q, tile_size - dot_inset),  # Top edge
-        (3 * q, tile_size - dot_inset),  # Top edge
-        (tile_size - dot_inset, 3 * q),  # Right edge
-        (tile_size - dot_inset, q),  # Right edge
-        (3 * q, dot_inset),  # Bottom edge
-        (q, dot_inset),  # Bottom edge
-        (dot_inset, q),  # Left edge
-        (dot_inset, 3 * q),  # Left edge
-    ]
+    endpoints2d = _endpoints2d(tile_size, dot_inset)
     center = np.array([tile_size / 2, tile_size / 2])
 
-    # Create individual groove polygons first
-    groove_polygons = []
+    # Use dot_depth if specified, otherwise use channel_depth
+    actual_dot_depth = dot_depth if dot_depth is not None else channel_depth
+
+    # A groove's round end caps sit inside its endpoint dots when the dots are
+    # at least as wide and deep, so straight grooves can be plain rectangles
+    caps_hidden = (
+        endpoint_dot_radius >= path_radius and actual_dot_depth >= channel_depth
+    )
+
+    # Collect every groove as coordinates first so the Shapely geometry is
+    # built with one vectorized call per operation
+    outlines = []  # closed analytic groove outlines
+    centerlines = []  # matching curve for each outline, None if straight
+    curves = []  # centerlines whose outlines folded and need buffering
     for i, j in matching:
         p0 = np.array(endpoints2d[i])
         p1 = np.array(endpoints2d[j])
-        ts = np.linspace(0, 1, bezier_steps)
-        curve = np.vstack(
-            [(1 - t) ** 2 * p0 + 2 * (1 - t) * t * center + t**2 * p1 for t in ts]
+        # Pairs mirrored through the center give a straight line
+        if caps_hidden and np.allclose(p0 + p1, 2 * center):
+            d = p1 - p0
+            n = np.array([-d[1], d[0]]) * (path_radius / np.linalg.norm(d))
+            outlines.append(np.array([p0 + n, p1 + n, p1 - n, p0 - n]))
+            centerlines.append(None)
+            continue
+        # Quadratic Bezier in Horner form: p0 + t * (B + t * A)
+        A = p0 - 2 * center + p1
+        B = 2 * (center - p0)
+        # Chord error over a parameter step h is |A| * h^2 / 4, so straighter
+        # curves need fewer samples to stay within bezier_tolerance
+        steps = int(np.ceil(np.sqrt(np.linalg.norm(A) / (4 * bezier_tolerance)))) + 1
+        steps = min(bezier_steps, max(8, steps))
+        # Bezier parameter as a column vector so each curve is one broadcast expression
+        ts = np.linspace(0, 1, steps)[:, None]
+        curve = p0 + ts * (B + ts * A)
+        # Offset along the analytic normal of the derivative B + 2tA rather
+        # than buffering; caps are left off when the dots cover them
+        tube = _bezier_tube(curve, B + 2 * ts * A, path_radius, caps=not caps_hidden)
+        outlines.append(tube)
+        centerlines.append(curve)
+
+    groove_parts = []
+    if outlines:
+        coords, indices = _ragged(outlines)
+        tubes = shapely.polygons(shapely.linearrings(coords, indices=indices))
+        # Outlines fold over themselves where the radius exceeds the
+        # curvature; buffer those curves instead
+        valid = shapely.is_valid(tubes)
+        groove_parts.extend(tubes[valid])
+        curves.extend(c for c, ok in zip(centerlines, valid) if not ok)
+    if curves:
+        coords, indices = _ragged(curves)
+        lines = shapely.linestrings(coords, indices=indices)
+        groove_parts.extend(
+            shapely.buffer(lines, path_radius, cap_style="round", join_style="round")
+        )
+
+    # Endpoint dots only depend on the tile layout, so they are shared
+    dot_polygons = _endpoint_dots(tile_size, dot_inset, endpoint_dot_radius)
+    if len(dot_polygons) < 8:
+        raise RuntimeError(
+            f"Failed to create all endpoint dots! Only {len(dot_polygons)} were created. Check your dot radius and tile size."
         )
-        line = LineString(curve)
-        tube = line.buffer(path_radius, cap_style=1, join_style=1)
-        groove_polygons.append(tube)
 
-    # Merge overlapping groove polygons using shapely union
-    if groove_polygons:
-        merged_grooves = unary_union(groove_polygons)
+    # Merge grooves and dots in 2D so the cutter is extruded in one pass;
+    # they only need separate layers when cut to different depths
+    if actual_dot_depth == channel_depth:
+        cut_layers = [(_union_parts([*groove_parts, *dot_polygons]), channel_depth)]
+    else:
+        cut_layers = [
+            (_union_parts(groove_parts), channel_depth),
+            (_union_parts(dot_polygons), actual_dot_depth),
+        ]
 
+    # Extrude each layer down from the tile top; every piece is its own
+    # cutter so no combined mesh has to be copied together
+    cutters = []
+    for outline, depth in cut_layers:
+        # Snap to a fine grid; sparsely sampled straight grooves otherwise
+        # leave slivers that earcut triangulates into open extrusions
+        outline = shapely.set_precision(outline, _GRID_SIZE)
         # Handle both single polygon and multipolygon cases
-        if merged_grooves.geom_type == "Polygon":
-            groove_meshes = [
-                extrude_polygon(merged_grooves, height=channel_depth, engine=engine)
-            ]
-        elif merged_grooves.geom_type == "MultiPolygon":
-            groove_meshes = []
-            for polygon in merged_grooves.geoms:
-                groove_mesh = extrude_polygon(
-                    polygon, height=channel_depth, engine=engine
+        polygons = outline.geoms if outline.geom_type == "MultiPolygon" else [outline]
+        for polygon in polygons:
+            if polygon.is_empty:
+                continue
+            cutter = extrude_polygon(polygon, height=depth, engine=engine)
+            cutter.apply_translation([0, 0, tile_thickness - depth])
+            # Extruding a valid polygon is watertight by construction, so the
+            # expensive mesh checks only run when debugging
+            if check_cutters and not (cutter.is_watertight and cutter.volume > 0):
+                raise RuntimeError(
+                    f"Cutter extrusion is not a closed volume: {polygon}"
                 )
-                groove_meshes.append(groove_mesh)
-        else:
-            groove_meshes = []
+            cutters.append(cutter)
+
+    if cutters and _BOOL_ENGINE == "manifold":
+        # Drive manifold3d directly rather than through trimesh's dispatch;
+        # a batch subtract unions all the cutters natively
+        carved = _to_trimesh(
+            manifold3d.Manifold.batch_boolean(
+                [_base_manifold(tile_size, tile_thickness)]
+                + [_to_manifold(c) for c in cutters],
+                manifold3d.OpType.Subtract,
+            )
+        )
+    elif cutters:
+        carved = difference(
+            [_base_box(tile_size, tile_thickness)] + cutters, engine=_BOOL_ENGINE
+        )
     else:
-        groove_meshes = []
+        # The base is shared between calls, so never hand it out directly
+        carved = _base_box(tile_size, tile_thickness).copy()
 
-    # Apply translation to all groove meshes
-    for groove_mesh in groove_meshes:
-        groove_mesh.apply_translation([0, 0, tile_thickness - channel_depth])
+    return carved
 
-    # Use dot_depth if specified, otherwise use channel_depth
-    actual_dot_depth = dot_depth if dot_depth is not None else channel_depth
 
-    # Create endpoint dots as cylinders, clipped to the tile boundary
-    endpoint_dots = []
-    for i in range(8):
-        x, y = endpoints2d[i]
-        try:
-            # Create a simple cylinder
-            cylinder = trimesh.creation.cylinder(
-                radius=endpoint_dot_radius, height=actual_dot_depth, sections=32
-            )
-            # Position the cylinder so its top is flush with the tile top
-            cylinder.apply_translation([x, y, tile_thickness - actual_dot_depth / 2])
-            # Clip to tile boundary by creating a box and intersecting
-            tile_box = trimesh.creation.box(
-                extents=[tile_size, tile_size, actual_dot_depth],
-                transform=trimesh.transformations.translation_matrix(
-                    [
-                        tile_size / 2,
-                        tile_size / 2,
-                        tile_thickness - actual_dot_depth / 2,
-                    ]
-                ),
-            )
-            # Intersect cylinder with tile box
-            try:
-                clipped_cylinder = trimesh.boolean.intersection(
-                    [cylinder, tile_box], engine="manifold"
-                )
-                if clipped_cylinder is not None and clipped_cylinder.volume > 0:
-                    endpoint_dots.append(clipped_cylinder)
-                else:
-                    print(
-                        f"Warning: Invalid clipped cylinder at endpoint {i}, skipping"
-                    )
-            except Exception as e:
-                print(f"Warning: Boolean intersection failed at endpoint {i}: {e}")
-                # Fallback: use original cylinder if intersection fails
-                if cylinder.volume > 0:
-                    endpoint_dots.append(cylinder)
-        except Exception as e:
-            print(f"Warning: Failed to create cylinder dot at endpoint {i}: {e}")
-
-    # After all endpoint dot creation logic
-    if len(endpoint_dots) < 8:
-        raise RuntimeError(
-            f"Failed to create all endpoint dots! Only {len(endpoint_dots)} were created. Check your dot radius and tile size."
-        )
+# Binary STL record: normal, three vertices, attribute byte count
+_STL_DTYPE = np.dtype([("n", "<3f4"), ("v", "<9f4"), ("att", "<u2")])
 
-    # Combine all groove meshes
-    channel_mesh = None
-    if groove_meshes:
-        channel_mesh = trimesh.util.concatenate(groove_meshes)
-    dot_mesh = None
-    if endpoint_dots:
-        dot_mesh = trimesh.util.concatenate(endpoint_dots)
-
-    # Validate meshes before boolean operations
-    def is_valid_mesh(mesh):
-        """Check if mesh is valid for boolean operations."""
-        if mesh is None:
-            return False
-        # Check if mesh has volume and is watertight
-        return mesh.volume > 0 and mesh.is_watertight and mesh.is_winding_consistent
-
-    # Subtract both grooves and endpoint dots from the base
-    cutters = []
-    if channel_mesh is not None and is_valid_mesh(channel_mesh):
-        cutters.append(channel_mesh)
-    if dot_mesh is not None and is_valid_mesh(dot_mesh):
-        cutters.append(dot_mesh)
 
-    if cutters:
-        try:
-            carved = difference([base] + cutters, engine="manifold")
-        except Exception as e:
-            print(f"Warning: Manifold boolean failed: {e}")
-            try:
-                carved = difference([base] + cutters, engine="scad")
-            except Exception as e2:
-                raise RuntimeError(
-                    f"Failed to create tile mesh: both manifold and scad boolean operations failed. Manifold error: {e}, SCAD error: {e2}"
-                )
-    else:
-        carved = base
+def _write_stl(mesh: trimesh.Trimesh, path: str):
+    """Write a binary STL in one buffer, skipping trimesh's export dispatch."""
+    records = np.zeros(len(mesh.faces), dtype=_STL_DTYPE)
+    records["n"] = mesh.face_normals
+    records["v"] = mesh.triangles.reshape((-1, 9))
+    with open(path, "wb") as f:
+        # 80 byte blank header followed by the triangle count
+        f.write(struct.pack("<80xI", len(records)) + records.tobytes())
 
-    return carved
+
+def _export_tile(indexed_matching, output_dir: str, **mesh_kwargs) -> str:
+    """Build and write a single tile, returning the STL path."""
+    idx, m = indexed_matching
+    mesh = create_tile_mesh(m, **mesh_kwargs)
+    path = os.path.join(output_dir, f"tile_{idx:03d}.stl")
+    _write_stl(mesh, path)
+    return path
 
 
 def export_tiles(
@@ -217,25 +368,30 @@ def export_tiles(
     dot_inset: float = 0.0,
     dot_depth: float = None,
 ):
-    """Export Path Tiles meshes to STL."""
+    """Export Path Tiles meshes to STL, building tiles in parallel."""
     os.makedirs(output_dir, exist_ok=True)
-    pool = random.sample(matchings, sample_size) if sample_size else matchings
-
-    for idx, m in enumerate(pool, start=1):
-        mesh = create_tile_mesh(
-            m,
-            tile_size=tile_size,
-            tile_thickness=tile_thickness,
-            channel_depth=channel_depth,
-            path_radius=path_radius,
-            endpoint_dot_radius=endpoint_dot_radius,
-            dot_inset=dot_inset,
-            dot_depth=dot_depth,
-            triang_engine=triang_engine,
-        )
-        path = os.path.join(output_dir, f"tile_{idx:03d}.stl")
-        mesh.export(path)
-        print(f"→ Exported {path}")
+    if sample_size and sample_size < len(matchings):
+        pool = random.sample(matchings, sample_size)
+    else:
+        pool = matchings
+
+    # Tiles are independent; each worker writes its own STL so only the
+    # path is sent back to the parent process
+    worker = partial(
+        _export_tile,
+        output_dir=output_dir,
+        tile_size=tile_size,
+        tile_thickness=tile_thickness,
+        channel_depth=channel_depth,
+        path_radius=path_radius,
+        endpoint_dot_radius=endpoint_dot_radius,
+        dot_inset=dot_inset,
+        dot_depth=dot_depth,
+        triang_engine=triang_engine,
+    )
+    with ProcessPoolExecutor() as ex:
+        paths = list(ex.map(worker, enumerate(pool, start=1), chunksize=4))
+    print(f"→ Exported {len(paths)} tiles to {output_dir}")
 
 
 def main():
@@ -244,8 +400,8 @@ def main():
     )
     parser.add_argument(
         "--engine",
-        choices=["earcut", "triangle"],
-        help="Triangulation engine ('earcut' for mapbox-earcut, 'triangle' for triangle).",
+        choices=["manifold", "earcut", "triangle"],
+        help="Triangulation engine ('manifold' for manifold3d, 'earcut' for mapbox-earcut, 'triangle' for triangle).",
     )
     parser.add_argument(
         "--sample",
@@ -297,6 +453,11 @@ def main():
         type=float,
         help="Depth of endpoint dots in mm (default: same as channel-depth).",
     )
+    parser.add_argument(
+        "--unique",
+        action="store_true",
+        help="Skip matchings that are rotations of one another (35 unique tiles).",
+    )
     args = parser.parse_args()
 
     engine = args.engine or DEFAULT_ENGINE
@@ -307,6 +468,8 @@ def main():
 
     endpoints = list(range(8))
     all_matchings = list(generate_matchings(endpoints))
+    if args.unique:
+        all_matchings = unique_matchings(all_matchings)
     export_tiles(
         matchings=all_matchings,
         output_dir=args.output,
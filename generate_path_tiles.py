@@ -2,24 +2,65 @@ import random
 
 
 def generate_matchings(points):
-    """Recursively yield all perfect matchings on the list of points."""
-    if not points:
-        yield []
-        return
-    first = points[0]
-    for i in range(1, len(points)):
-        second = points[i]
-        pair = (first, second)
-        rest = points[1:i] + points[i + 1 :]
-        for matching in generate_matchings(rest):
-            yield [pair] + matching
+    """Yield all perfect matchings on the list of points as tuples of pairs.
+
+    Remaining points are tracked as a bitmask of indices, so no lists are
+    copied while recursing.
+    """
+    points = list(points)
+
+    def rec(mask, acc):
+        if mask == 0:
+            yield acc
+            return
+        # Pair the lowest remaining point with each other remaining point
+        i = (mask & -mask).bit_length() - 1
+        rest = mask ^ (1 << i)
+        m = rest
+        while m:
+            j = (m & -m).bit_length() - 1
+            yield from rec(rest ^ (1 << j), acc + ((points[i], points[j]),))
+            m &= m - 1
+
+    yield from rec((1 << len(points)) - 1, ())
+
+
+def canonical_matching(matching, n_points: int = 8):
+    """Return the lexicographically smallest rotation of a matching.
+
+    Endpoints are numbered clockwise with two per edge, so a quarter turn
+    shifts every index by 2. Mirror images are left distinct since a
+    printed tile can't be flipped over.
+    """
+    return min(
+        tuple(
+            sorted(
+                tuple(sorted(((a + k) % n_points, (b + k) % n_points)))
+                for a, b in matching
+            )
+        )
+        for k in range(0, n_points, 2)
+    )
+
+
+def unique_matchings(matchings, n_points: int = 8):
+    """Keep one representative of each matching up to rotation."""
+    seen = set()
+    unique = []
+    for matching in matchings:
+        key = canonical_matching(matching, n_points)
+        if key not in seen:
+            seen.add(key)
+            unique.append(matching)
+    return unique
 
 
 def main():
     endpoints = list(range(8))
     all_matchings = list(generate_matchings(endpoints))
 
-    print(f"Total perfect matchings on 8 endpoints: {len(all_matchings)}\n")
+    print(f"Total perfect matchings on 8 endpoints: {len(all_matchings)}")
+    print(f"Unique up to rotation: {len(unique_matchings(all_matchings))}\n")
 
     sample = random.sample(all_matchings, 36)
     print("Sample of 36 random, unique swirl patterns (each is 4 connected pairs):\n")